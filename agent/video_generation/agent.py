@@ -28,6 +28,7 @@ os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "global")
 os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "True")
 
 from subagents import story_agent, storyboard_agent, video_agent
+from utils.delivery_utils import signed_urls_enabled
 from utils.storage_utils import upload_data_to_gcs
 
 async def before_model_callback(
@@ -74,10 +75,16 @@ root_agent = LlmAgent(
     Each video shot must be 8 seconds long.
 
     """.strip(),
-    global_instruction="""
+    global_instruction=(
+        """
+        When showing media to the user, use the "url", "preview_url" and "poster_url" links as they are.
+        Never show "gs://" URIs to the user.
+        When calling any functions/tools, keep "gs://" URIs as they are.
+        """ if signed_urls_enabled() else """
         When output "gs://" URIs to the user, replace "gs://" with "https://storage.mtls.cloud.google.com/".
         When calling any functions/tools, keep "gs://" URIs as they are.
-    """.strip(),
+        """
+    ).strip(),
     sub_agents=[story_agent, storyboard_agent, video_agent],
     before_model_callback=before_model_callback,
 )
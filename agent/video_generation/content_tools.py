@@ -14,11 +14,10 @@
 
 from pathlib import Path
 import httpx
-import mimetypes
-import uuid
 
 from google.adk.tools import ToolContext
-from google.genai import types
+
+from subagents import save_media_artifact
 
 def file_exists(file_path: str) -> bool:
     """Checks if a local file exists"""
@@ -53,13 +52,11 @@ async def read_web_image(image_url: str, tool_context: ToolContext) -> dict:
             "application/x-binary"
         )
         mime_type = content_type.split(';')[0].strip()
-        ext = mimetypes.guess_extension(mime_type)
-        if not ext:
-            ext = ".bin"
-        file_name = f"{uuid.uuid4().hex}{ext}"
-        await tool_context.save_artifact(
-            filename=file_name,
-            artifact=types.Part.from_bytes(data=image_data, mime_type=mime_type)
+        file_name = await save_media_artifact(
+            tool_context,
+            image_url,
+            image_data,
+            mime_type
         )
         return {
             "status": "success",
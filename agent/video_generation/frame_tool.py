@@ -0,0 +1,64 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from typing import Literal, Optional
+
+from google.adk.tools import ToolContext
+
+from nano_banana_tool import MediaAsset
+from utils.media_utils import extract_frame_from_gcs_video
+from utils.storage_utils import upload_data_to_gcs
+
+# Set logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+async def extract_video_frame(
+    tool_context: ToolContext,
+    video_gsc_uri: str,
+    timestamp_seconds: Optional[float] = None,
+    image_format: Literal["png", "jpeg"] = "png",
+) -> MediaAsset:
+    """Extracts a frame from a generated video, by default its last frame.
+    Use it to get the last frame of the previous shot.
+    Returns a MediaAsset object with the GCS URI of the frame image or an error text.
+
+    Args:
+        video_gsc_uri (str): GCS URI of the video.
+        timestamp_seconds (Optional[float], optional): Position of the frame
+            in seconds from the start of the video.
+            Defaults to None, which means the last frame.
+        image_format (str, optional): Format of the frame image.
+            Supported values are "png" and "jpeg". Defaults to "png".
+
+    Returns:
+        MediaAsset: object with the GCS URI of the frame image or an error text.
+    """
+    try:
+        image_data, mime_type = await extract_frame_from_gcs_video(
+            video_gsc_uri,
+            timestamp_seconds,
+            image_format
+        )
+    except Exception as e:
+        logger.error(f"Frame extraction from {video_gsc_uri} failed: {e}")
+        return MediaAsset(uri="", error=str(e))
+    gcs_uri = await upload_data_to_gcs(
+        tool_context.agent_name,
+        image_data,
+        mime_type
+    )
+    return MediaAsset(uri=gcs_uri)
@@ -14,6 +14,7 @@
 
 import logging
 import mimetypes
+import os
 from typing import Literal, Optional
 
 from google.adk.models.google_llm import Gemini
@@ -23,17 +24,35 @@ from google.genai import types
 
 from pydantic import BaseModel
 
+from utils.hedging import HedgingPolicy
 from utils.storage_utils import upload_data_to_gcs
 
 # Set logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+IMAGE_MODEL = "gemini-2.5-flash-image"
+# Hedged requests: if a request is slower than the observed
+# IMAGE_HEDGING_PERCENTILE latency, a second one is sent.
+# IMAGE_HEDGING_BUDGET caps hedges as a fraction of all requests.
+image_hedging_policy = HedgingPolicy(
+    enabled=os.environ.get("IMAGE_HEDGING_ENABLED", "false").lower() == "true",
+    percentile=float(os.environ.get("IMAGE_HEDGING_PERCENTILE", "0.9")),
+    budget=float(os.environ.get("IMAGE_HEDGING_BUDGET", "0.1")),
+)
+
 
 class MediaAsset(BaseModel):
     uri: str
     error: Optional[str] = None
 
+def _has_image(response: types.GenerateContentResponse) -> bool:
+    return bool(response and response.parts and any(
+        (part.file_data and part.file_data.file_uri)
+        or (part.inline_data and part.inline_data.data)
+        for part in response.parts
+    ))
+
 async def generate_image(
     tool_context: ToolContext,
     prompt: str,
@@ -72,9 +91,9 @@ async def generate_image(
             )
         )
 
-    for _ in range (0, 5):
-        response = genai_client.models.generate_content(
-            model="gemini-2.5-flash-image",
+    def _request():
+        return genai_client.aio.models.generate_content(
+            model=IMAGE_MODEL,
             contents=[content],
             config=types.GenerateContentConfig(
                 response_modalities=["IMAGE"],
@@ -83,6 +102,13 @@ async def generate_image(
                 )
             )
         )
+
+    for _ in range (0, 5):
+        response = await image_hedging_policy.call(
+            IMAGE_MODEL,
+            _request,
+            _has_image
+        )
         response_text = ""
         if response and response.parts:
             for part in response.parts:
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import json
+import logging
+import mimetypes
+import os
 from typing import Any, Dict, Optional
-import uuid
 
 from pydantic import BaseModel
 
@@ -22,10 +25,178 @@ from google.adk.agents import Agent
 from google.adk.tools import AgentTool, BaseTool, ToolContext
 from google.genai import types
 
+from frame_tool import extract_video_frame
 from nano_banana_tool import generate_image
 from veo3_agent import veo3_agent
+from utils.delivery_utils import get_media_url, signed_urls_enabled
+from utils.media_names import get_preview_uris
+from utils.media_utils import render_preview
 from utils.utils import load_prompt_from_file
-from utils.storage_utils import download_data_from_gcs
+from utils.storage_utils import (
+    download_data_from_gcs,
+    get_gcs_object_digest,
+    upload_data_to_gcs_uri
+)
+
+# Set logging
+logger = logging.getLogger(__name__)
+
+# Whether to show low-bitrate proxies of generated videos in the UI
+# instead of the full-quality files.
+CREATE_VIDEO_PREVIEWS = (
+    os.environ.get("CREATE_VIDEO_PREVIEWS", "true").lower() == "true"
+)
+# Session state key of the index of source URIs to artifact names.
+MEDIA_ARTIFACTS_STATE_KEY = "media_artifacts"
+# Session state key of the reverse index of artifact names to source URIs.
+MEDIA_ARTIFACT_NAMES_STATE_KEY = "media_artifact_names"
+# Session state key of the list of source URIs served with signed URLs.
+# Signed URLs grant access to whoever has them, so they are not persisted.
+SIGNED_MEDIA_URIS_STATE_KEY = "signed_media_uris"
+
+
+def _artifact_name(digest: str, mime_type: str) -> str:
+    ext = mimetypes.guess_extension(mime_type) or ""
+    return f"{digest}{ext}"
+
+
+async def save_media_artifact(
+    tool_context: ToolContext,
+    uri: str,
+    data: Optional[bytes] = None,
+    mime_type: Optional[str] = None,
+) -> str:
+    """Saves a media asset to the Artifact Store under a content-addressed name.
+
+    The session state keeps an index of source URIs to artifact names,
+    so an asset that was already saved is neither downloaded nor written again.
+    If `data` is not provided, `uri` must be a `gs://` URI of an immutable
+    object, and its data is downloaded only when needed.
+    Content at other URIs may change, so provided data is always hashed.
+    Returns the artifact name.
+    """
+    index: Dict[str, str] = tool_context.state.get(MEDIA_ARTIFACTS_STATE_KEY, {})
+    if data is None and uri in index:
+        return index[uri]
+    digest = None
+    if data is None:
+        digest, mime_type = get_gcs_object_digest(uri)
+        if not digest:
+            # No MD5 in the metadata, so the data itself is hashed.
+            inline_data = download_data_from_gcs(uri)
+            data, mime_type = inline_data.data, inline_data.mime_type
+    if data is not None:
+        mime_type = mime_type or "application/octet-stream"
+        digest = hashlib.md5(data).hexdigest()
+    artifact_name = _artifact_name(digest, mime_type) # type: ignore
+    names: Dict[str, str] = tool_context.state.get(
+        MEDIA_ARTIFACT_NAMES_STATE_KEY,
+        {}
+    )
+    if artifact_name not in names:
+        if data is not None:
+            artifact = types.Part.from_bytes(data=data, mime_type=mime_type)
+        else:
+            artifact = types.Part(inline_data=download_data_from_gcs(uri))
+        await tool_context.save_artifact(
+            filename=artifact_name,
+            artifact=artifact
+        )
+        tool_context.state[MEDIA_ARTIFACT_NAMES_STATE_KEY] = {
+            **names,
+            artifact_name: uri
+        }
+    # Assigning a new dict makes the state change part of the event delta.
+    tool_context.state[MEDIA_ARTIFACTS_STATE_KEY] = {**index, uri: artifact_name}
+    return artifact_name
+
+
+async def save_video_preview(
+    uri: str,
+    tool_context: ToolContext
+) -> Optional[Dict[str, str]]:
+    """Renders a proxy video and a poster image for a generated video,
+    stores them next to the original and saves them to the Artifact Store.
+    Returns their GCS URIs, or None if rendering failed.
+    """
+    proxy_uri, poster_uri = get_preview_uris(uri)
+    preview = {"preview_uri": proxy_uri, "poster_uri": poster_uri}
+    # The source video may be indexed without a preview, when rendering failed
+    # and the full video was saved instead. The proxy is indexed only
+    # after it was uploaded.
+    if (
+        proxy_uri in tool_context.state.get(MEDIA_ARTIFACTS_STATE_KEY, {})
+        or proxy_uri in tool_context.state.get(SIGNED_MEDIA_URIS_STATE_KEY, [])
+    ):
+        return preview
+    try:
+        proxy_data, poster_data = await render_preview(uri)
+    except Exception as e:
+        logger.error(f"Preview rendering for {uri} failed: {e}")
+        return None
+    upload_data_to_gcs_uri(proxy_uri, proxy_data, "video/mp4")
+    upload_data_to_gcs_uri(poster_uri, poster_data, "image/jpeg")
+    if signed_urls_enabled():
+        return preview
+    await save_media_artifact(tool_context, poster_uri, poster_data, "image/jpeg")
+    proxy_artifact = await save_media_artifact(
+        tool_context,
+        proxy_uri,
+        proxy_data,
+        "video/mp4"
+    )
+    # The original video is represented by its proxy in the Artifact Store.
+    index = tool_context.state.get(MEDIA_ARTIFACTS_STATE_KEY, {})
+    tool_context.state[MEDIA_ARTIFACTS_STATE_KEY] = {**index, uri: proxy_artifact}
+    return preview
+
+
+def add_media_urls(
+    response: Dict[str, Any],
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """Adds signed URLs of the response's media assets,
+    so the media is served directly from storage rather than by the agent."""
+    uris = tool_context.state.get(SIGNED_MEDIA_URIS_STATE_KEY, [])
+    new_uris = []
+    for key in ("uri", "preview_uri", "poster_uri"):
+        if not (response.get(key) or "").startswith("gs://"):
+            continue
+        if response[key] not in uris:
+            new_uris.append(response[key])
+        try:
+            response[key.replace("uri", "url")] = get_media_url(response[key])
+        except Exception as e:
+            # The media is already generated, so don't fail the tool call.
+            logger.error(f"Signing URL of {response[key]} failed: {e}")
+            response["url_error"] = str(e)
+    if new_uris:
+        tool_context.state[SIGNED_MEDIA_URIS_STATE_KEY] = [*uris, *new_uris]
+    return response
+
+
+async def process_media_asset(
+    asset: Dict[str, Any],
+    tool_context: ToolContext
+) -> bool:
+    """Saves a media asset of a tool response to the Artifact Store,
+    or adds its signed URLs. Returns True if the asset was updated."""
+    uri = asset.get("uri") or ""
+    if not uri.startswith("gs://"):
+        return False
+    mime_type = mimetypes.guess_type(uri)[0] or ""
+    preview = None
+    if CREATE_VIDEO_PREVIEWS and mime_type.startswith("video/"):
+        preview = await save_video_preview(uri, tool_context)
+        if preview:
+            asset.update(preview)
+    if signed_urls_enabled():
+        add_media_urls(asset, tool_context)
+        return True
+    if preview:
+        return True
+    await save_media_artifact(tool_context, uri)
+    return False
 
 
 async def extract_media_callback(
@@ -38,7 +209,7 @@ async def extract_media_callback(
     if not tool_response:
         return
     if not isinstance(tool_response, BaseModel):
-        if isinstance(tool_response, dict) and len(tool_response) == "1" and "result" in tool_response:
+        if isinstance(tool_response, dict) and len(tool_response) == 1 and "result" in tool_response:
             response = tool_response["result"]
         else:
             response = tool_response
@@ -50,12 +221,27 @@ async def extract_media_callback(
     elif isinstance(tool_response, BaseModel):
         response = tool_response.model_dump(exclude_none=False)
     if isinstance(response, dict):
-        uri = response.get("uri", "")
-        if uri and uri.startswith("gs://"):
-            await tool_context.save_artifact(
-                filename=uuid.uuid4().hex,
-                artifact=types.Part(inline_data=download_data_from_gcs(uri))
-            )
+        variants = [
+            variant for variant in response.get("variants") or []
+            if isinstance(variant, dict)
+        ]
+        if not variants:
+            if await process_media_asset(response, tool_context):
+                return response
+            return
+        # Multiple takes of a video, each with its own media.
+        # The top-level asset repeats one of the takes,
+        # so it gets that take's media instead of processing it again.
+        changed = False
+        for variant in variants:
+            changed = await process_media_asset(variant, tool_context) or changed
+            if variant.get("uri") and variant.get("uri") == response.get("uri"):
+                response.update(
+                    {key: value for key, value in variant.items()
+                     if key not in response or response[key] is None}
+                )
+        if changed:
+            return response
 
 story_agent = Agent(
     model="gemini-2.5-pro",
@@ -76,7 +262,7 @@ storyboard_agent = Agent(
         4. Optional last frame of the **previous** shot.
     """,
     instruction=load_prompt_from_file("storyboard_agent.md"),
-    tools=[generate_image],
+    tools=[generate_image, extract_video_frame],
     after_tool_callback=extract_media_callback,
     output_key="storyboard",
 )
@@ -0,0 +1,139 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+from datetime import timedelta
+import hashlib
+import hmac
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+import google.auth
+from google.cloud.storage import Blob
+from google.oauth2 import service_account
+
+from utils.storage_utils import storage_client
+
+# Set logging
+logger = logging.getLogger(__name__)
+
+# "artifacts" - media is saved to the Artifact Store and served by the agent.
+# "signed_urls" - media is served directly from GCS or Cloud CDN.
+MEDIA_DELIVERY = os.environ.get("MEDIA_DELIVERY", "artifacts")
+MEDIA_URL_TTL_SECONDS = int(os.environ.get("MEDIA_URL_TTL_SECONDS", "3600"))
+# Cached URLs are re-signed when they have less than this time left.
+MEDIA_URL_REFRESH_SECONDS = int(
+    os.environ.get("MEDIA_URL_REFRESH_SECONDS", "300")
+)
+MEDIA_URL_CACHE_SIZE = int(os.environ.get("MEDIA_URL_CACHE_SIZE", "10000"))
+# Cloud CDN signed URLs. Signed locally with the CDN key, no network calls.
+MEDIA_CDN_BASE_URL = os.environ.get("MEDIA_CDN_BASE_URL", "").rstrip("/")
+MEDIA_CDN_KEY_NAME = os.environ.get("MEDIA_CDN_KEY_NAME", "")
+MEDIA_CDN_KEY = os.environ.get("MEDIA_CDN_KEY", "")
+# Service account key file for signing GCS URLs locally.
+# Not needed if the default credentials are a service account key.
+MEDIA_SIGNING_KEY_FILE = os.environ.get("MEDIA_SIGNING_KEY_FILE", "")
+
+_signed_urls: Dict[str, Tuple[str, float]] = {}
+_cdn_signing_enabled = bool(
+    MEDIA_CDN_BASE_URL and MEDIA_CDN_KEY_NAME and MEDIA_CDN_KEY
+)
+
+
+def _get_signing_credentials() -> Optional[service_account.Credentials]:
+    """Returns credentials that can sign GCS URLs locally, if any.
+    Only service account keys sign locally. User credentials have
+    no private key, while Compute Engine / Cloud Run and impersonated
+    credentials sign through IAM signBlob API, which is a network call per URL."""
+    if MEDIA_SIGNING_KEY_FILE:
+        return service_account.Credentials.from_service_account_file(
+            MEDIA_SIGNING_KEY_FILE
+        )
+    credentials, _ = google.auth.default()
+    if isinstance(credentials, service_account.Credentials):
+        return credentials
+    return None
+
+
+_signing_credentials = (
+    _get_signing_credentials()
+    if MEDIA_DELIVERY == "signed_urls" and not _cdn_signing_enabled
+    else None
+)
+_signed_urls_available = _cdn_signing_enabled or _signing_credentials is not None
+if MEDIA_DELIVERY == "signed_urls" and not _signed_urls_available:
+    logger.error(
+        "MEDIA_DELIVERY is `signed_urls`, but the credentials cannot sign URLs "
+        "locally. Set MEDIA_SIGNING_KEY_FILE to a service account key file, "
+        "or configure Cloud CDN signing with MEDIA_CDN_BASE_URL, "
+        "MEDIA_CDN_KEY_NAME and MEDIA_CDN_KEY. "
+        "Falling back to serving media from the Artifact Store."
+    )
+
+
+def signed_urls_enabled() -> bool:
+    return MEDIA_DELIVERY == "signed_urls" and _signed_urls_available
+
+
+def _sign_cdn_url(blob: Blob, expires_at: int) -> str:
+    url = f"{MEDIA_CDN_BASE_URL}/{quote(blob.name, safe='/')}"
+    url_to_sign = f"{url}?Expires={expires_at}&KeyName={MEDIA_CDN_KEY_NAME}"
+    key = base64.urlsafe_b64decode(MEDIA_CDN_KEY)
+    signature = base64.urlsafe_b64encode(
+        hmac.new(key, url_to_sign.encode("utf-8"), hashlib.sha1).digest()
+    ).decode("utf-8")
+    return f"{url_to_sign}&Signature={signature}"
+
+
+def _sign_gcs_url(blob: Blob, ttl_seconds: int) -> str:
+    return blob.generate_signed_url(
+        version="v4",
+        expiration=timedelta(seconds=ttl_seconds),
+        method="GET",
+        credentials=_signing_credentials,
+    )
+
+
+def _cache_signed_url(url: str, signed_url: str, expires_at: float, now: float):
+    # Re-inserting moves the entry to the end, so the dict stays
+    # ordered from the oldest to the newest signed URL.
+    _signed_urls.pop(url, None)
+    if len(_signed_urls) >= MEDIA_URL_CACHE_SIZE:
+        for cached_url, (_, cached_expires_at) in list(_signed_urls.items()):
+            if cached_expires_at - now <= MEDIA_URL_REFRESH_SECONDS:
+                del _signed_urls[cached_url]
+        while len(_signed_urls) >= MEDIA_URL_CACHE_SIZE:
+            del _signed_urls[next(iter(_signed_urls))]
+    _signed_urls[url] = (signed_url, expires_at)
+
+
+def get_media_url(url: str) -> str:
+    """Returns a short-lived signed HTTPS URL of a `gs://` object.
+    URLs are cached per object until they are close to expiry.
+    """
+    now = time.time()
+    cached = _signed_urls.get(url)
+    if cached and cached[1] - now > MEDIA_URL_REFRESH_SECONDS:
+        return cached[0]
+    blob = Blob.from_string(url, client=storage_client)
+    expires_at = int(now) + MEDIA_URL_TTL_SECONDS
+    if _cdn_signing_enabled:
+        signed_url = _sign_cdn_url(blob, expires_at)
+    else:
+        signed_url = _sign_gcs_url(blob, MEDIA_URL_TTL_SECONDS)
+    _cache_signed_url(url, signed_url, expires_at, now)
+    return signed_url
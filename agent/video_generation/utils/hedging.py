@@ -0,0 +1,163 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from collections import deque
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+# Set logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """Sliding window of observed request latencies."""
+
+    def __init__(self, window_size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window_size)
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, math.ceil(percentile * len(ordered)) - 1)
+        return ordered[max(index, 0)]
+
+
+class HedgingPolicy:
+    """Hedged requests policy.
+
+    If a request doesn't complete within the latency threshold,
+    a second identical request is sent. The first good result wins,
+    the other request is cancelled.
+    The threshold is the given percentile of latencies observed for the model.
+    Hedges are limited by the budget - a fraction of all requests.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 0.9,
+        budget: float = 0.1,
+        min_samples: int = 20,
+        default_delay_seconds: float = 20.0,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.default_delay_seconds = default_delay_seconds
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.requests_count = 0
+        self.hedges_count = 0
+
+    def _histogram(self, model: str) -> LatencyHistogram:
+        if model not in self.histograms:
+            self.histograms[model] = LatencyHistogram()
+        return self.histograms[model]
+
+    def hedge_delay(self, model: str) -> float:
+        """Returns the latency threshold after which a request is hedged."""
+        histogram = self._histogram(model)
+        if len(histogram.samples) < self.min_samples:
+            return self.default_delay_seconds
+        return histogram.percentile(self.percentile) # type: ignore
+
+    def _can_hedge(self) -> bool:
+        # One hedge is always allowed, so the budget works for small counts.
+        return self.hedges_count < self.budget * self.requests_count + 1
+
+    async def call(
+        self,
+        model: str,
+        request: Callable[[], Awaitable[T]],
+        is_good: Callable[[T], bool] = lambda _: True,
+    ) -> T:
+        """Makes a request, hedging it if it's slower than the threshold.
+
+        Args:
+            model (str): Model name, used for latency tracking.
+            request (Callable[[], Awaitable[T]]): Function that makes the request.
+            is_good (Callable[[T], bool], optional): Whether the result is
+                good enough to win. Defaults to any result.
+
+        Returns:
+            T: The first good result, or the last result if none was good.
+                Raises the last error if no request returned a result.
+        """
+        self.requests_count += 1
+        histogram = self._histogram(model)
+        if not self.enabled:
+            start = time.monotonic()
+            result = await request()
+            histogram.record(time.monotonic() - start)
+            return result
+        # Start time of each request, to record its latency.
+        started: Dict[asyncio.Task, float] = {}
+
+        def _start():
+            task = asyncio.ensure_future(request())
+            started[task] = time.monotonic()
+            return task
+
+        tasks = {_start()}
+        delay = self.hedge_delay(model)
+        hedged = False
+        result: Any = None
+        has_result = False
+        error: Optional[BaseException] = None
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks,
+                    timeout=None if hedged else delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception():
+                        # Errors such as 429 are fast under overload,
+                        # recording them would make hedging more eager.
+                        error = task.exception()
+                        continue
+                    histogram.record(time.monotonic() - started[task])
+                    result = task.result()
+                    has_result = True
+                    if is_good(result):
+                        return result
+                if not done and not hedged:
+                    # The request is slower than the threshold.
+                    hedged = True
+                    if self._can_hedge():
+                        logger.info(
+                            f"Hedging {model} request after {delay:.1f} seconds."
+                        )
+                        self.hedges_count += 1
+                        tasks.add(_start())
+        finally:
+            for task in tasks:
+                # Losing requests are the slowest ones. Their elapsed time
+                # is a lower bound of their latency, and dropping it
+                # would make the threshold drift down.
+                histogram.record(time.monotonic() - started[task])
+                task.cancel()
+        if error and not has_result:
+            raise error
+        return result
@@ -0,0 +1,25 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+PROXY_SUFFIX = ".proxy.mp4"
+POSTER_SUFFIX = ".poster.jpg"
+
+
+def get_preview_uris(video_url: str) -> tuple[str, str]:
+    """Returns GCS URIs of the proxy video and the poster image
+    stored next to the original video."""
+    stem = os.path.splitext(video_url)[0]
+    return f"{stem}{PROXY_SUFFIX}", f"{stem}{POSTER_SUFFIX}"
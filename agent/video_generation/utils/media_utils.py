@@ -0,0 +1,174 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import Optional
+
+import imageio_ffmpeg
+
+from utils.storage_utils import get_authorized_media_request
+
+# Set logging
+logger = logging.getLogger(__name__)
+
+# How far from the end of the video to seek when looking for the last frame.
+# Decoding starts at the key frame before that point, so only the last GOP
+# is downloaded.
+LAST_FRAME_SEEK_SECONDS = 1.0
+PREVIEW_HEIGHT = int(os.environ.get("PREVIEW_HEIGHT", "480"))
+PREVIEW_VIDEO_BITRATE = os.environ.get("PREVIEW_VIDEO_BITRATE", "600k")
+PREVIEW_AUDIO_BITRATE = "64k"
+PREVIEW_WORKERS = int(
+    os.environ.get("PREVIEW_WORKERS", str(os.cpu_count() or 1))
+)
+FRAME_FORMATS = {
+    "png": ("png", "image/png", ".png"),
+    "jpeg": ("mjpeg", "image/jpeg", ".jpg"),
+}
+
+
+def _http_headers_args(headers: dict[str, str]) -> list[str]:
+    """Returns ffmpeg arguments that send HTTP headers with input requests.
+    ffmpeg takes protocol options such as `headers` only as values
+    on the command line. The access token in them is short-lived and scoped
+    to reading from GCS (see `media_credentials`)."""
+    return [
+        "-headers",
+        "".join(f"{key}: {value}\r\n" for key, value in headers.items())
+    ]
+
+
+async def run_ffmpeg(args: list[str]) -> None:
+    """Runs ffmpeg with the given arguments, raises RuntimeError on failure."""
+    process = await asyncio.create_subprocess_exec(
+        imageio_ffmpeg.get_ffmpeg_exe(),
+        "-hide_banner",
+        "-loglevel", "error",
+        "-nostdin",
+        *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg failed with code {process.returncode}: "
+            f"{stderr.decode(errors='replace').strip()}"
+        )
+
+
+async def extract_frame_from_gcs_video(
+    video_url: str,
+    timestamp_seconds: Optional[float] = None,
+    image_format: str = "png",
+) -> tuple[bytes, str]:
+    """Extracts a single frame from a video in GCS without downloading it.
+
+    ffmpeg reads the video over HTTP using range requests:
+    it fetches the container index, seeks to the key frame preceding
+    the requested position, and decodes only that GOP.
+
+    Args:
+        video_url (str): `gs://` URI of the video.
+        timestamp_seconds (Optional[float], optional): Position of the frame.
+            Defaults to None, which means the last frame of the video.
+        image_format (str, optional): "png" or "jpeg". Defaults to "png".
+
+    Returns:
+        tuple[bytes, str]: image data and its mime type.
+    """
+    codec, mime_type, ext = FRAME_FORMATS[image_format]
+    # Refreshing the credentials is a blocking network call.
+    https_url, headers = await asyncio.to_thread(
+        get_authorized_media_request,
+        video_url
+    )
+    if timestamp_seconds is None:
+        seek_args = ["-sseof", f"-{LAST_FRAME_SEEK_SECONDS}"]
+        frame_args = ["-update", "1"] # keep overwriting until the last frame
+    else:
+        seek_args = ["-ss", f"{max(timestamp_seconds, 0.0)}"]
+        frame_args = ["-frames:v", "1"]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        frame_path = Path(temp_dir) / f"frame{ext}"
+        await run_ffmpeg([
+            *_http_headers_args(headers),
+            "-seekable", "1",
+            *seek_args,
+            "-i", https_url,
+            "-an",
+            *frame_args,
+            "-c:v", codec,
+            "-q:v", "2",
+            "-y", str(frame_path),
+        ])
+        if not frame_path.exists():
+            raise RuntimeError(f"No frame was extracted from {video_url}.")
+        return frame_path.read_bytes(), mime_type
+
+
+# Limits the number of concurrent preview renders. Each render is
+# a separate ffmpeg process, so renders already run in parallel.
+_preview_semaphore = asyncio.Semaphore(PREVIEW_WORKERS)
+
+
+async def render_preview(video_url: str) -> tuple[bytes, bytes]:
+    """Renders a low-bitrate proxy video and a poster image
+    for a video in GCS in one ffmpeg pass.
+
+    Args:
+        video_url (str): `gs://` URI of the video.
+
+    Returns:
+        tuple[bytes, bytes]: proxy MP4 data and poster JPEG data.
+    """
+    # Refreshing the credentials is a blocking network call.
+    https_url, headers = await asyncio.to_thread(
+        get_authorized_media_request,
+        video_url
+    )
+    scale = f"scale=-2:{PREVIEW_HEIGHT}"
+    async with _preview_semaphore:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            proxy_path = Path(temp_dir) / "proxy.mp4"
+            poster_path = Path(temp_dir) / "poster.jpg"
+            await run_ffmpeg([
+                *_http_headers_args(headers),
+                "-i", https_url,
+                # Proxy video
+                "-map", "0:v:0", "-map", "0:a:0?",
+                "-vf", scale,
+                "-c:v", "libx264",
+                "-preset", "veryfast",
+                "-profile:v", "main",
+                "-pix_fmt", "yuv420p",
+                "-b:v", PREVIEW_VIDEO_BITRATE,
+                "-maxrate", PREVIEW_VIDEO_BITRATE,
+                "-bufsize", PREVIEW_VIDEO_BITRATE,
+                "-c:a", "aac",
+                "-b:a", PREVIEW_AUDIO_BITRATE,
+                "-movflags", "+faststart",
+                "-y", str(proxy_path),
+                # Poster image
+                "-map", "0:v:0",
+                "-vf", scale,
+                "-frames:v", "1",
+                "-q:v", "4",
+                "-y", str(poster_path),
+            ])
+            return proxy_path.read_bytes(), poster_path.read_bytes()
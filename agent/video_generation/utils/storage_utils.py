@@ -12,12 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
 import hashlib
 import mimetypes
 import os
+from typing import Optional
+
+from urllib.parse import quote
 
 from google.api_core import exceptions
 import google.auth
+from google.auth.transport.requests import Request
 from google.genai import types
 from google.cloud.storage import Bucket, Client, Blob
 
@@ -33,20 +38,56 @@ ai_bucket_name = os.environ.get(
     f"{project_id}-adk-video-agent-logs-data"
 )
 ai_bucket = storage_client.get_bucket(ai_bucket_name)
-md5_hash = hashlib.md5()
+media_credentials, _ = google.auth.default(
+    scopes=["https://www.googleapis.com/auth/devstorage.read_only"]
+)
+GCS_MEDIA_ENDPOINT = "https://storage.googleapis.com/"
+# Uploaded media is content-addressed or derived from immutable media,
+# so it can be cached for a long time. Shared caches may only store it
+# when it's served through Cloud CDN; otherwise the bucket is private.
+MEDIA_CACHE_CONTROL = os.environ.get(
+    "MEDIA_CACHE_CONTROL",
+    (
+        "public, max-age=31536000, immutable"
+        if os.environ.get("MEDIA_CDN_BASE_URL")
+        else "private, max-age=31536000, immutable"
+    )
+)
 
 
 async def upload_data_to_gcs(agent_id: str, data: bytes, mime_type: str) -> str:
-    md5_hash.update(data)
-    file_name = md5_hash.hexdigest()
+    # Digest of this data only, so the same content maps to the same blob.
+    file_name = hashlib.md5(data).hexdigest()
     ext = mimetypes.guess_extension(mime_type) or ""
     file_name = f"{file_name}{ext}"
     blob_name = f"assets/{agent_id}/{file_name}"
     blob = Blob(bucket=ai_bucket, name=blob_name)
+    blob.cache_control = MEDIA_CACHE_CONTROL
     blob.upload_from_string(data, content_type=mime_type, client=storage_client)
     gcs_url = f"gs://{ai_bucket_name}/{blob_name}"
     return gcs_url
 
+def upload_data_to_gcs_uri(url: str, data: bytes, mime_type: str) -> str:
+    blob = Blob.from_string(url, client=storage_client)
+    blob.cache_control = MEDIA_CACHE_CONTROL
+    blob.upload_from_string(data, content_type=mime_type, client=storage_client)
+    return url
+
+def get_gcs_object_digest(url: str) -> tuple[Optional[str], str]:
+    """Returns hex MD5 digest and mime type of a GCS object
+    from its metadata, without downloading the data.
+    Composite objects have no MD5, so their digest is None.
+    Their CRC32C is too short to tell different content apart."""
+    blob = Blob.from_string(url, client=storage_client)
+    blob.reload(client=storage_client)
+    mime_type = (
+        mimetypes.guess_type(blob.name)[0]
+        or blob.content_type
+        or "application/octet-stream"
+    )
+    digest = base64.b64decode(blob.md5_hash).hex() if blob.md5_hash else None
+    return digest, mime_type.split(";")[0].strip()
+
 def download_data_from_gcs(url: str) -> types.Blob:
     blob = Blob.from_string(url, client=storage_client)
     blob_data = blob.download_as_bytes(client=storage_client)
@@ -62,4 +103,18 @@ def download_data_from_gcs(url: str) -> types.Blob:
         display_name=file_name,
         data=blob_data,
         mime_type=mime_type.strip()
-    )
\ No newline at end of file
+    )
+
+def get_authorized_media_request(url: str) -> tuple[str, dict[str, str]]:
+    """Returns an HTTPS URL and headers for reading a `gs://` object over HTTP.
+    The endpoint supports range requests, so readers such as ffmpeg
+    only fetch the byte ranges they need.
+    """
+    blob = Blob.from_string(url, client=storage_client)
+    if not media_credentials.valid:
+        media_credentials.refresh(Request())
+    https_url = (
+        f"{GCS_MEDIA_ENDPOINT}{blob.bucket.name}/{quote(blob.name, safe='/')}"
+    )
+    headers = {"Authorization": f"Bearer {media_credentials.token}"}
+    return https_url, headers
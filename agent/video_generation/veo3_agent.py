@@ -17,13 +17,13 @@ import json
 import logging
 import mimetypes
 import time
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 import uuid
 
 from google.adk.models.google_llm import Gemini
 from google.adk.tools import ToolContext
 
-from google.genai import types
+from google.genai import Client, types
 
 from pydantic import BaseModel
 
@@ -37,9 +37,67 @@ AUTHORIZED_URI = "https://storage.mtls.cloud.google.com/"
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+MAX_VARIANTS = 4
+
+class VideoTake(BaseModel):
+    uri: str
+    error: Optional[str] = None
+    seed: Optional[int] = None
+
+# Not self-referencing: tool response schemas cannot be recursive.
 class MediaAsset(BaseModel):
     uri: str
     error: Optional[str] = None
+    seed: Optional[int] = None
+    variants: Optional[List[VideoTake]] = None
+
+async def _generate_video_variant(
+    genai_client: Client,
+    source: types.GenerateVideosSource,
+    config: types.GenerateVideosConfig,
+    seed: int,
+    invocation: str,
+) -> VideoTake:
+    config = config.model_copy(update={"seed": seed})
+    result_media = VideoTake(uri="", seed=seed)
+    logger.info(f"[{invocation}] Generating a video with seed {seed}.")
+
+    start = time.time()
+    # Errors stay within the take, so the other takes are still returned.
+    try:
+        gen_video_op = await genai_client.aio.models.generate_videos(
+            model="veo-3.1-generate-preview",
+            source=source,
+            config=config
+        )
+        while not gen_video_op.done:
+            await asyncio.sleep(OPERATION_WAIT_TIME)
+            gen_video_op = await genai_client.aio.operations.get(gen_video_op)
+    except Exception as e:
+        result_media.error = f"[{invocation}] Seed {seed}: {e}"
+        logger.error(result_media.error)
+        return result_media
+    if gen_video_op.error:
+        result_media.error = json.dumps(gen_video_op.error, indent=2)
+        logger.error(f"[{invocation}] {result_media.error}")
+    elif not gen_video_op.result or not gen_video_op.result.generated_videos:
+        result_media.error = f"[{invocation}] Empty generation result."
+        logger.error(result_media.error)
+    else:
+        end = time.time()
+        logger.info(
+            f"[{invocation}] Video generation operation took {int(end - start)} seconds."
+        )
+        for video in gen_video_op.result.generated_videos:
+            if not video.video or not video.video.uri:
+                continue
+            result_media.uri = video.video.uri
+            authorized_url = result_media.uri.replace("gs://", AUTHORIZED_URI)
+            logger.info(
+                f"[{invocation}] Video URL: {authorized_url}"
+            )
+            break
+    return result_media
 
 async def generate_video(
     tool_context: ToolContext,
@@ -48,6 +106,8 @@ async def generate_video(
     end_frame_image_gsc_uri: Optional[str] = None,
     video_duration_seconds: int = 8,
     aspect_ratio: Literal["16:9", "9:16"] = "16:9",
+    number_of_variants: int = 1,
+    seed: int = 1,
 ) -> MediaAsset:
     """Generates a video using Veo 3 model.
     Returns a MediaAsset object with the GCS URI of the generated video or an error text.
@@ -67,9 +127,16 @@ async def generate_video(
             Defaults to 8.
         aspect_ratio (str, optional): Aspect ratio of the video.
             Supported values are "16:9" and "9:16". Defaults to "16:9".
+        number_of_variants (int, optional): Number of takes to generate
+            at the same time, from 1 to 4. Take N uses seed + N - 1.
+            Defaults to 1.
+        seed (int, optional): Seed of the first take.
+            Pass the seed of a take to reproduce it. Defaults to 1.
 
     Returns:
-        MediaAsset: object with the GCS URI of the generated image or an error text.
+        MediaAsset: object with the GCS URI and the seed of the generated video
+            or an error text. With multiple variants, the object describes
+            the first successful take, and `variants` lists all takes.
     """
 
     gemini_client = Gemini()
@@ -84,8 +151,9 @@ async def generate_video(
     config=types.GenerateVideosConfig(
         aspect_ratio=aspect_ratio,
         output_gcs_uri=f"gs://{ai_bucket_name}/{agent_name}",
-        number_of_videos=1, # Only one video, otherwise cannot use seed.
-        seed=1, # fix it here to make it _somewhat_ reproducible.
+        # One video per operation, otherwise cannot use seed.
+        # Variants are separate operations with derived seeds.
+        number_of_videos=1,
         duration_seconds=video_duration_seconds,
         person_generation="allow_adult",
         # enhance_prompt=True
@@ -101,37 +169,22 @@ async def generate_video(
             gcs_uri=end_frame_image_gsc_uri,
             mime_type=mimetypes.guess_type(end_frame_image_gsc_uri)[0]
         )
-    result_media = MediaAsset(uri="")
-    logger.info(f"[{invocation}] Generating a video.")
 
-    start = time.time()
-    gen_video_op = await genai_client.aio.models.generate_videos(
-        model="veo-3.1-generate-preview",
-        source=source,
-        config=config
-    )
-    while not gen_video_op.done:
-        await asyncio.sleep(OPERATION_WAIT_TIME)
-        gen_video_op = await genai_client.aio.operations.get(gen_video_op)
-    if gen_video_op.error:
-        result_media.error = json.dumps(gen_video_op.error, indent=2)
-        logger.error(f"[{invocation}] {result_media.error}")
-    elif not gen_video_op.result or not gen_video_op.result.generated_videos:
-        result_media.error = f"[{invocation}] Empty generation result."
-        logger.error(result_media.error)
-    else:
-        end = time.time()
-        logger.info(
-            f"[{invocation}] Video generation operation took {int(end - start)} seconds."
+    number_of_variants = min(max(number_of_variants, 1), MAX_VARIANTS)
+    takes = await asyncio.gather(*[
+        _generate_video_variant(
+            genai_client,
+            source,
+            config,
+            seed + index,
+            invocation
         )
-        for video in gen_video_op.result.generated_videos:
-            if not video.video or not video.video.uri:
-                continue
-            result_media.uri = video.video.uri
-            logger.info(
-                f"[{invocation}] Video URL: {result_media.uri.replace("gs://", AUTHORIZED_URI)}"
-            )
-            break
+        for index in range(number_of_variants)
+    ])
+    take = next((take for take in takes if take.uri), takes[0])
+    result_media = MediaAsset(**take.model_dump())
+    if number_of_variants > 1:
+        result_media.variants = takes
     logger.info(
         f"[{invocation}] Video Generation result:\n{result_media.model_dump_json(indent=2)}"
     )
@@ -140,7 +193,7 @@ async def generate_video(
 
 veo3_agent = ToolAgent(
     name="veo3_agent",
-    description="Generates a video based on a prompt and an optional starting frame image.",
+    description="Generates a video, or several variants of it, based on a prompt and an optional starting frame image.",
     function=generate_video,
 )
 
@@ -0,0 +1,384 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Garbage collector of generated assets not referenced by any session."""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import sys
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO
+
+sys.path.append(str(Path(__file__).parent.parent / "agent" / "video_generation"))
+
+from utils.media_names import POSTER_SUFFIX, PROXY_SUFFIX
+
+if TYPE_CHECKING:
+    from google.adk.sessions import BaseSessionService
+    from google.cloud.storage import Blob, Client
+
+GCS_URI_PATTERN = re.compile(r"gs://[A-Za-z0-9._\-]+/[^\s\"'<>\\)\]]+")
+STORAGE_CLASSES = {
+    "nearline": "NEARLINE",
+    "coldline": "COLDLINE",
+    "archive": "ARCHIVE",
+}
+
+# Set logging
+logger = logging.getLogger(__name__)
+
+
+def _source_stem(uri: str) -> str:
+    """Returns the URI without its extension.
+    Proxy videos and posters map to the stem of their source video."""
+    for suffix in (PROXY_SUFFIX, POSTER_SUFFIX):
+        if uri.endswith(suffix):
+            return uri[:-len(suffix)]
+    return os.path.splitext(uri)[0]
+
+
+def extract_gcs_uris(text: str) -> set[str]:
+    """Returns `gs://` URIs mentioned in a text, such as a JSON dump."""
+    return {uri.rstrip(".,;:") for uri in GCS_URI_PATTERN.findall(text)}
+
+
+def collect_manifest_references(manifest_paths: Iterable[Path]) -> set[str]:
+    """Collects `gs://` URIs from batch renderer manifests,
+    so finished deliverables are kept after their sessions are gone."""
+    references = set()
+    for manifest_path in manifest_paths:
+        with manifest_path.open(encoding="utf-8") as manifest:
+            for line in manifest:
+                references.update(extract_gcs_uris(line))
+    return references
+
+
+def _list_all_sessions(
+    session_service: "BaseSessionService",
+    app_name: str,
+) -> list[tuple[str, str]]:
+    """Returns (user id, session id) pairs of sessions of all users.
+    `list_sessions` only lists sessions of one user,
+    so the session stores are queried directly."""
+    from google.adk.sessions import (
+        DatabaseSessionService,
+        VertexAiSessionService
+    )
+    from google.adk.sessions.database_session_service import StorageSession
+
+    if isinstance(session_service, VertexAiSessionService):
+        reasoning_engine_id = session_service._get_reasoning_engine_id(app_name)
+        api_sessions = session_service._get_api_client().agent_engines.sessions.list(
+            name=f"reasoningEngines/{reasoning_engine_id}",
+        )
+        return [
+            (api_session.user_id, api_session.name.split("/")[-1]) # type: ignore
+            for api_session in api_sessions
+        ]
+    if isinstance(session_service, DatabaseSessionService):
+        with session_service.database_session_factory() as sql_session:
+            rows = (
+                sql_session.query(StorageSession.user_id, StorageSession.id)
+                .filter(StorageSession.app_name == app_name)
+                .all()
+            )
+        return [(user_id, session_id) for user_id, session_id in rows]
+    raise TypeError(
+        f"Unsupported session service: {type(session_service).__name__}."
+    )
+
+
+async def collect_references(
+    session_service: "BaseSessionService",
+    app_names: list[str],
+    allow_empty: bool = False,
+) -> set[str]:
+    """Collects `gs://` URIs mentioned in events and state of all sessions
+    of all users.
+    Raises RuntimeError if the service has no sessions, unless `allow_empty`,
+    because then every asset would look unreferenced.
+    """
+    references = set()
+    sessions_count = 0
+    for app_name in app_names:
+        sessions = _list_all_sessions(session_service, app_name)
+        for user_id, session_id in sessions:
+            session = await session_service.get_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+            )
+            if not session:
+                continue
+            references.update(extract_gcs_uris(session.model_dump_json()))
+        sessions_count += len(sessions)
+        logger.info(
+            f"{app_name}: {len(sessions)} sessions, "
+            f"{len(references)} referenced URIs so far."
+        )
+    if not sessions_count and not allow_empty:
+        raise RuntimeError(
+            f"{type(session_service).__name__} has no sessions "
+            f"of {', '.join(app_names)}. Check the app names and the session "
+            "source, or pass --allow-empty if that's expected."
+        )
+    return references
+
+
+def scan_unreferenced(
+    storage_client: "Client",
+    bucket_name: str,
+    prefixes: list[str],
+    references: set[str],
+    grace_period: timedelta,
+    page_size: int = 1000,
+) -> Iterator["Blob"]:
+    """Yields objects under the prefixes which no session references
+    and which are older than the grace period.
+    The bucket is listed page by page, so memory use doesn't grow with its size.
+    """
+    referenced_stems = {_source_stem(uri) for uri in references}
+    cutoff = datetime.now(timezone.utc) - grace_period
+    for prefix in prefixes:
+        blobs = storage_client.list_blobs(
+            bucket_name,
+            prefix=prefix,
+            page_size=page_size,
+        )
+        for page in blobs.pages:
+            for blob in page:
+                uri = f"gs://{bucket_name}/{blob.name}"
+                if uri in references or _source_stem(uri) in referenced_stems:
+                    continue
+                if blob.time_created and blob.time_created > cutoff:
+                    continue
+                yield blob
+
+
+def collect_garbage(
+    blobs: Iterable["Blob"],
+    action: str,
+    dry_run: bool,
+    report: TextIO,
+) -> dict[str, int]:
+    """Deletes unreferenced objects or moves them to a colder storage class.
+    Writes a JSONL report line per object. Returns summary counters.
+    """
+    summary = {"objects": 0, "bytes": 0, "skipped": 0}
+    storage_class = STORAGE_CLASSES.get(action)
+    for blob in blobs:
+        if storage_class and blob.storage_class == storage_class:
+            summary["skipped"] += 1
+            continue
+        report.write(json.dumps({
+            "uri": f"gs://{blob.bucket.name}/{blob.name}",
+            "size": blob.size,
+            "time_created": (
+                blob.time_created.isoformat() if blob.time_created else None
+            ),
+            "storage_class": blob.storage_class,
+            "action": action,
+            "dry_run": dry_run,
+        }) + "\n")
+        summary["objects"] += 1
+        summary["bytes"] += blob.size or 0
+        if dry_run:
+            continue
+        if storage_class:
+            blob.update_storage_class(storage_class)
+        else:
+            blob.delete()
+    return summary
+
+
+def _session_services(
+    project_id: str,
+    location: str,
+    agent_engine_id: Optional[str],
+    session_db_urls: list[str],
+) -> list["BaseSessionService"]:
+    from google.adk.sessions import (
+        DatabaseSessionService,
+        VertexAiSessionService
+    )
+
+    services: list["BaseSessionService"] = []
+    if agent_engine_id:
+        services.append(
+            VertexAiSessionService(
+                project=project_id,
+                location=location,
+                agent_engine_id=agent_engine_id,
+            )
+        )
+    for db_url in session_db_urls:
+        services.append(DatabaseSessionService(db_url=db_url))
+    return services
+
+
+################################################################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generated Assets Garbage Collector"
+    )
+    parser.add_argument(
+        "--project-id",
+        "-p",
+        default=os.environ.get("GOOGLE_CLOUD_PROJECT"),
+        type=str,
+        help="Google Cloud Project Id.",
+    )
+    parser.add_argument(
+        "--location",
+        "-l",
+        default=os.environ.get("GOOGLE_CLOUD_LOCATION"),
+        type=str,
+        help="Location of the Agent Engine.",
+    )
+    parser.add_argument(
+        "--bucket",
+        "-b",
+        default=os.environ.get("AI_ASSETS_BUCKET"),
+        type=str,
+        help="Bucket with generated assets.",
+    )
+    parser.add_argument(
+        "--agent-engine-id",
+        default=os.environ.get("AGENT_ENGINE_ID"),
+        type=str,
+        help="Id of the Agent Engine with live sessions.",
+    )
+    parser.add_argument(
+        "--app-name",
+        action="append",
+        default=None,
+        type=str,
+        help="App name of the sessions. Can be repeated. "
+             "Defaults to AGENT_ENGINE_NAME and video_generation.",
+    )
+    parser.add_argument(
+        "--session-db-url",
+        action="append",
+        default=[],
+        type=str,
+        help="Additional session database, such as the batch renderer's one. "
+             "Can be repeated.",
+    )
+    parser.add_argument(
+        "--manifest",
+        action="append",
+        default=[],
+        type=Path,
+        help="Batch renderer manifest.jsonl whose media must be kept. "
+             "Can be repeated.",
+    )
+    parser.add_argument(
+        "--allow-empty",
+        action="store_true",
+        help="Continue if a session source has no sessions. "
+             "Without sessions, all assets are unreferenced.",
+    )
+    parser.add_argument(
+        "--prefix",
+        action="append",
+        default=None,
+        type=str,
+        help="Object prefix to collect. Can be repeated. "
+             "Defaults to assets/ and generate_video_tool_agent/.",
+    )
+    parser.add_argument(
+        "--grace-days",
+        default=7,
+        type=float,
+        help="Objects created within this number of days are kept.",
+    )
+    parser.add_argument(
+        "--action",
+        choices=["delete", *STORAGE_CLASSES.keys()],
+        default="delete",
+        help="What to do with unreferenced objects.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Only report unreferenced objects. Use --no-dry-run to apply the action.",
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        type=Path,
+        help="JSONL report file. Defaults to stdout.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if not args.bucket:
+        parser.error("--bucket or AI_ASSETS_BUCKET is required.")
+    app_names = args.app_name or list(
+        filter(None, [os.environ.get("AGENT_ENGINE_NAME"), "video_generation"])
+    )
+    session_services = _session_services(
+        args.project_id,
+        args.location,
+        args.agent_engine_id,
+        args.session_db_url,
+    )
+    if not session_services:
+        # Without sessions, everything would look unreferenced.
+        parser.error("--agent-engine-id or --session-db-url is required.")
+
+    async def _collect_all_references() -> set[str]:
+        references = set()
+        for service in session_services:
+            references.update(
+                await collect_references(service, app_names, args.allow_empty)
+            )
+        return references
+
+    references = asyncio.run(_collect_all_references())
+    references.update(collect_manifest_references(args.manifest))
+    if not args.manifest:
+        logger.warning(
+            "No --manifest files given. Media of finished batch jobs "
+            "is only kept while their session database is passed "
+            "with --session-db-url."
+        )
+
+    from google.cloud.storage import Client
+
+    blobs = scan_unreferenced(
+        Client(project=args.project_id),
+        args.bucket,
+        args.prefix or ["assets/", "generate_video_tool_agent/"],
+        references,
+        timedelta(days=args.grace_days),
+    )
+    report = (
+        args.report.open("w", encoding="utf-8") if args.report else sys.stdout
+    )
+    try:
+        summary = collect_garbage(blobs, args.action, args.dry_run, report)
+    finally:
+        if args.report:
+            report.close()
+    logger.info(
+        f"{'Would ' + args.action if args.dry_run else args.action.capitalize()}: "
+        f"{summary['objects']} objects, {summary['bytes']} bytes. "
+        f"Already in the target storage class: {summary['skipped']}."
+    )
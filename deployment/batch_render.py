@@ -0,0 +1,348 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Headless batch renderer of story-to-video jobs."""
+
+import argparse
+import asyncio
+import json
+import logging
+import mimetypes
+from pathlib import Path
+import sys
+from typing import Any, Optional
+import uuid
+
+sys.path.append(str(Path(__file__).parent.parent / "agent"))
+
+from google.adk.artifacts import (
+    BaseArtifactService,
+    GcsArtifactService,
+    InMemoryArtifactService
+)
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, DatabaseSessionService
+from google.genai import types
+
+from video_generation import root_agent
+from subagents import MEDIA_ARTIFACTS_STATE_KEY, SIGNED_MEDIA_URIS_STATE_KEY
+from utils.media_names import POSTER_SUFFIX, PROXY_SUFFIX
+
+APP_NAME = "video_generation"
+USER_ID = "batch_render"
+COMPLETION_MARKER = "BATCH_COMPLETE"
+BATCH_INSTRUCTION = f"""
+You are running in a headless batch mode. There is no user to review or approve your work.
+Make all creative decisions yourself and go through all phases and all shots without asking for confirmation:
+write the story, then for every shot create the storyboard and generate the video.
+When videos for all shots are generated, reply with {COMPLETION_MARKER}.
+""".strip()
+CONTINUE_MESSAGE = (
+    "Continue with the next step without asking for my approval. "
+    f"Reply with {COMPLETION_MARKER} when videos for all shots are generated."
+)
+
+# Set logging
+logger = logging.getLogger(__name__)
+
+
+def _job_message(job: dict[str, Any]) -> str:
+    message = f"{BATCH_INSTRUCTION}\n\nBRIEF:\n{job['brief']}"
+    if job.get("shots"):
+        message += f"\n\nNumber of shots: {job['shots']}."
+    if job.get("aspect_ratio"):
+        message += f"\n\nAspect ratio: {job['aspect_ratio']}."
+    return message
+
+
+def _collect_media(state: dict[str, Any]) -> tuple[list[str], list[str]]:
+    """Returns GCS URIs of generated videos and images of a session."""
+    videos = []
+    images = []
+    media_uris = dict.fromkeys([
+        *state.get(MEDIA_ARTIFACTS_STATE_KEY, {}),
+        *state.get(SIGNED_MEDIA_URIS_STATE_KEY, []),
+    ])
+    for uri in media_uris:
+        if uri.endswith(PROXY_SUFFIX) or uri.endswith(POSTER_SUFFIX):
+            continue
+        mime_type = mimetypes.guess_type(uri)[0] or ""
+        if mime_type.startswith("video/"):
+            videos.append(uri)
+        elif mime_type.startswith("image/"):
+            images.append(uri)
+    return videos, images
+
+
+class BatchRenderer:
+    """Runs story-to-video jobs through the root agent without the Web UI.
+
+    Every job has a checkpoint file with its session id and progress,
+    so an interrupted batch continues from the last completed agent turn.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        session_service: BaseSessionService,
+        artifact_service: BaseArtifactService,
+        concurrency: int = 4,
+        max_turns: int = 30,
+        runner: Optional[Runner] = None,
+    ):
+        """
+        Args:
+            output_dir (Path): Directory for job checkpoints and the manifest.
+            session_service (BaseSessionService): Session service of the jobs.
+            artifact_service (BaseArtifactService): Artifact service of the jobs.
+            concurrency (int, optional): Maximum number of jobs
+                running at the same time. Defaults to 4.
+            max_turns (int, optional): Maximum number of agent turns
+                per job in one run. Defaults to 30.
+            runner (Optional[Runner], optional): Runner of the jobs,
+                which must use the same session service.
+                Defaults to a runner of the root agent.
+        """
+        self.output_dir = output_dir
+        self.checkpoints_dir = output_dir / "jobs"
+        self.checkpoints_dir.mkdir(parents=True, exist_ok=True)
+        self.session_service = session_service
+        self.runner = runner or Runner(
+            app_name=APP_NAME,
+            agent=root_agent,
+            session_service=session_service,
+            artifact_service=artifact_service,
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_turns = max_turns
+
+    def _checkpoint_path(self, job_id: str) -> Path:
+        return self.checkpoints_dir / f"{job_id}.json"
+
+    def _load_checkpoint(self, job_id: str) -> Optional[dict[str, Any]]:
+        path = self._checkpoint_path(job_id)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _save_checkpoint(self, checkpoint: dict[str, Any]):
+        path = self._checkpoint_path(checkpoint["job_id"])
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+        temp_path.replace(path)
+
+    async def _run_turn(self, session_id: str, text: str) -> str:
+        final_text = ""
+        async for event in self.runner.run_async(
+            user_id=USER_ID,
+            session_id=session_id,
+            new_message=types.Content(
+                role="user",
+                parts=[types.Part.from_text(text=text)]
+            ),
+        ):
+            if event.is_final_response() and event.content and event.content.parts:
+                final_text = "".join(
+                    part.text for part in event.content.parts if part.text
+                )
+        return final_text
+
+    async def run_job(self, job: dict[str, Any]) -> dict[str, Any]:
+        job_id = str(job["id"])
+        checkpoint: dict[str, Any] = {
+            "job_id": job_id,
+            "session_id": uuid.uuid4().hex,
+            "status": "pending",
+            "turns": 0,
+            "videos": [],
+            "images": [],
+            "error": None,
+        }
+        # Any failure must stay within the job, so the rest of the batch
+        # continues and the manifest is written.
+        try:
+            saved_checkpoint = self._load_checkpoint(job_id)
+            if saved_checkpoint and saved_checkpoint["status"] == "done":
+                logger.info(f"[{job_id}] Already done, skipping.")
+                return saved_checkpoint
+            if saved_checkpoint:
+                checkpoint = saved_checkpoint
+            async with self.semaphore:
+                await self._run_job_turns(job, checkpoint)
+        except Exception as e:
+            logger.exception(f"[{job_id}] Job failed.")
+            checkpoint["status"] = "failed"
+            checkpoint["error"] = str(e)
+        try:
+            self._save_checkpoint(checkpoint)
+        except Exception:
+            logger.exception(f"[{job_id}] Cannot save the checkpoint.")
+        logger.info(
+            f"[{job_id}] {checkpoint['status']}, "
+            f"{len(checkpoint['videos'])} video(s)."
+        )
+        return checkpoint
+
+    async def _run_job_turns(
+        self,
+        job: dict[str, Any],
+        checkpoint: dict[str, Any]
+    ):
+        job_id = checkpoint["job_id"]
+        session_id = checkpoint["session_id"]
+        session = await self.session_service.get_session(
+            app_name=APP_NAME,
+            user_id=USER_ID,
+            session_id=session_id
+        )
+        if not session:
+            session = await self.session_service.create_session(
+                app_name=APP_NAME,
+                user_id=USER_ID,
+                session_id=session_id
+            )
+            checkpoint["turns"] = 0
+        checkpoint["status"] = "running"
+        checkpoint["error"] = None
+        self._save_checkpoint(checkpoint)
+        # The turn budget is per run, so a job that ran out of turns
+        # continues when the batch is run again.
+        for _ in range(self.max_turns):
+            message = (
+                _job_message(job) if checkpoint["turns"] == 0
+                else CONTINUE_MESSAGE
+            )
+            logger.info(f"[{job_id}] Turn {checkpoint['turns'] + 1}.")
+            final_text = await self._run_turn(session_id, message)
+            session = await self.session_service.get_session(
+                app_name=APP_NAME,
+                user_id=USER_ID,
+                session_id=session_id
+            )
+            videos, images = _collect_media(session.state) # type: ignore
+            checkpoint["turns"] += 1
+            checkpoint["videos"] = videos
+            checkpoint["images"] = images
+            self._save_checkpoint(checkpoint)
+            shots = job.get("shots")
+            if COMPLETION_MARKER in final_text or (
+                shots and len(videos) >= int(shots)
+            ):
+                checkpoint["status"] = "done"
+                return
+        checkpoint["status"] = "failed"
+        checkpoint["error"] = (
+            f"Not completed after {self.max_turns} turns. "
+            "Run the batch again to continue."
+        )
+
+    async def run(self, jobs: list[dict[str, Any]]) -> Path:
+        """Runs all jobs and writes the results manifest.
+        Returns the manifest path."""
+        results = await asyncio.gather(*[self.run_job(job) for job in jobs])
+        manifest_path = self.output_dir / "manifest.jsonl"
+        with manifest_path.open("w", encoding="utf-8") as manifest:
+            for result in results:
+                manifest.write(json.dumps(result) + "\n")
+        return manifest_path
+
+
+def load_jobs(briefs_path: Path) -> list[dict[str, Any]]:
+    """Loads jobs from a JSONL file.
+    Each line is a JSON object with `brief`,
+    and optional `id`, `shots` and `aspect_ratio`.
+    Job ids must be unique.
+    """
+    jobs = []
+    job_ids = set()
+    for index, line in enumerate(
+        briefs_path.read_text(encoding="utf-8").splitlines()
+    ):
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        job.setdefault("id", f"job-{index:05d}")
+        # Jobs with the same id would share a checkpoint and a session.
+        if str(job["id"]) in job_ids:
+            raise ValueError(
+                f"Duplicate job id `{job['id']}` on line {index + 1}."
+            )
+        job_ids.add(str(job["id"]))
+        jobs.append(job)
+    return jobs
+
+
+################################################################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Batch Story-to-Video Renderer"
+    )
+    parser.add_argument(
+        "--briefs",
+        "-b",
+        required=True,
+        type=Path,
+        help="JSONL file with video briefs.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        required=True,
+        type=Path,
+        help="Directory for job checkpoints and the results manifest.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        default=4,
+        type=int,
+        help="Maximum number of jobs running at the same time.",
+    )
+    parser.add_argument(
+        "--max-turns",
+        default=30,
+        type=int,
+        help="Maximum number of agent turns per job in one run.",
+    )
+    parser.add_argument(
+        "--session-db-url",
+        default=None,
+        type=str,
+        help="Session database URL. Defaults to SQLite database in the output directory.",
+    )
+    parser.add_argument(
+        "--artifact-bucket",
+        default=None,
+        type=str,
+        help="GCS bucket for artifacts. Artifacts are kept in memory if not specified.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    session_db_url = (
+        args.session_db_url
+        or f"sqlite:///{(args.output_dir / 'sessions.db').absolute()}"
+    )
+    renderer = BatchRenderer(
+        output_dir=args.output_dir,
+        session_service=DatabaseSessionService(db_url=session_db_url),
+        artifact_service=(
+            GcsArtifactService(bucket_name=args.artifact_bucket)
+            if args.artifact_bucket
+            else InMemoryArtifactService()
+        ),
+        concurrency=args.concurrency,
+        max_turns=args.max_turns,
+    )
+    manifest_path = asyncio.run(renderer.run(load_jobs(args.briefs)))
+    print(manifest_path)
@@ -0,0 +1,41 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+import sys
+
+import google.auth
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import storage
+import pytest
+
+# Agent modules import each other as top-level modules.
+sys.path.append(str(Path(__file__).parent.parent / "agent" / "video_generation"))
+sys.path.append(str(Path(__file__).parent.parent / "deployment"))
+
+
+@pytest.fixture
+def offline_gcp(monkeypatch):
+    """Lets agent modules be imported without Google Cloud access.
+    They look up the default credentials and the assets bucket on import."""
+    monkeypatch.setattr(
+        google.auth,
+        "default",
+        lambda *args, **kwargs: (AnonymousCredentials(), "test-project")
+    )
+    monkeypatch.setattr(
+        storage.Client,
+        "get_bucket",
+        lambda self, bucket_name, *args, **kwargs: storage.Bucket(self, bucket_name)
+    )
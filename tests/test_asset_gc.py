@@ -0,0 +1,234 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import io
+import json
+from types import SimpleNamespace
+
+from google.adk.sessions import DatabaseSessionService
+import pytest
+
+from asset_gc import (
+    collect_garbage,
+    collect_manifest_references,
+    collect_references,
+    extract_gcs_uris,
+    scan_unreferenced,
+)
+
+BUCKET = "assets-bucket"
+OLD = datetime.now(timezone.utc) - timedelta(days=30)
+NEW = datetime.now(timezone.utc) - timedelta(hours=1)
+
+
+class FakeBlob:
+
+    def __init__(self, name, time_created=OLD, size=10, storage_class="STANDARD"):
+        self.name = name
+        self.time_created = time_created
+        self.size = size
+        self.storage_class = storage_class
+        self.bucket = SimpleNamespace(name=BUCKET)
+        self.deleted = False
+
+    def delete(self):
+        self.deleted = True
+
+    def update_storage_class(self, storage_class):
+        self.storage_class = storage_class
+
+
+class FakeClient:
+    """Lists blobs in pages of `page_size`, like the storage client."""
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def list_blobs(self, bucket_name, prefix, page_size):
+        assert bucket_name == BUCKET
+        matching = [blob for blob in self.blobs if blob.name.startswith(prefix)]
+        return SimpleNamespace(pages=[
+            matching[index:index + page_size]
+            for index in range(0, len(matching), page_size)
+        ])
+
+
+def _scan(blobs, references, prefixes=("assets/", "generate_video_tool_agent/")):
+    return [
+        blob.name for blob in scan_unreferenced(
+            FakeClient(blobs),
+            BUCKET,
+            list(prefixes),
+            set(references),
+            timedelta(days=7),
+            page_size=2,
+        )
+    ]
+
+
+def test_extract_gcs_uris_from_json_dump():
+    state = {
+        "media_artifacts": {f"gs://{BUCKET}/assets/a/1.png": "1.png"},
+        "text": f"See gs://{BUCKET}/v/sample_0.mp4, and (gs://{BUCKET}/x.jpg).",
+    }
+    assert extract_gcs_uris(json.dumps(state)) == {
+        f"gs://{BUCKET}/assets/a/1.png",
+        f"gs://{BUCKET}/v/sample_0.mp4",
+        f"gs://{BUCKET}/x.jpg",
+    }
+
+
+def test_extract_gcs_uris_from_escaped_json():
+    # Tool responses in events are JSON strings inside JSON.
+    text = json.dumps({"result": json.dumps({"uri": f"gs://{BUCKET}/a/b.mp4"})})
+    assert extract_gcs_uris(text) == {f"gs://{BUCKET}/a/b.mp4"}
+
+
+def test_referenced_objects_are_kept():
+    blobs = [
+        FakeBlob("assets/a/kept.png"),
+        FakeBlob("assets/a/orphan.png"),
+    ]
+    assert _scan(blobs, [f"gs://{BUCKET}/assets/a/kept.png"]) == [
+        "assets/a/orphan.png"
+    ]
+
+
+def test_previews_are_kept_with_their_source_video():
+    blobs = [
+        FakeBlob("generate_video_tool_agent/1/sample_0.mp4"),
+        FakeBlob("generate_video_tool_agent/1/sample_0.proxy.mp4"),
+        FakeBlob("generate_video_tool_agent/1/sample_0.poster.jpg"),
+        FakeBlob("generate_video_tool_agent/2/sample_0.proxy.mp4"),
+        FakeBlob("generate_video_tool_agent/2/sample_0.poster.jpg"),
+    ]
+    references = [f"gs://{BUCKET}/generate_video_tool_agent/1/sample_0.mp4"]
+    assert _scan(blobs, references) == [
+        "generate_video_tool_agent/2/sample_0.proxy.mp4",
+        "generate_video_tool_agent/2/sample_0.poster.jpg",
+    ]
+
+
+def test_referenced_preview_keeps_source_video():
+    blobs = [
+        FakeBlob("generate_video_tool_agent/1/sample_0.mp4"),
+        FakeBlob("generate_video_tool_agent/1/sample_0.proxy.mp4"),
+    ]
+    references = [f"gs://{BUCKET}/generate_video_tool_agent/1/sample_0.proxy.mp4"]
+    assert _scan(blobs, references) == []
+
+
+def test_similar_names_are_not_kept():
+    blobs = [FakeBlob("assets/a/1234.png"), FakeBlob("assets/a/12345.png")]
+    assert _scan(blobs, [f"gs://{BUCKET}/assets/a/1234.png"]) == [
+        "assets/a/12345.png"
+    ]
+
+
+def test_objects_within_grace_period_are_kept():
+    blobs = [
+        FakeBlob("assets/a/new.png", time_created=NEW),
+        FakeBlob("assets/a/old.png", time_created=OLD),
+    ]
+    assert _scan(blobs, []) == ["assets/a/old.png"]
+
+
+def test_only_prefixes_are_scanned():
+    blobs = [
+        FakeBlob("video_generation/user/session/artifact.png/0"),
+        FakeBlob("assets/a/orphan.png"),
+    ]
+    assert _scan(blobs, []) == ["assets/a/orphan.png"]
+
+
+def test_manifest_references(tmp_path):
+    manifest_path = tmp_path / "manifest.jsonl"
+    manifest_path.write_text(
+        json.dumps({
+            "job_id": "1",
+            "videos": [f"gs://{BUCKET}/generate_video_tool_agent/1/sample_0.mp4"],
+            "images": [f"gs://{BUCKET}/assets/a/1.png"],
+        }) + "\n",
+        encoding="utf-8"
+    )
+    references = collect_manifest_references([manifest_path])
+    blobs = [
+        FakeBlob("generate_video_tool_agent/1/sample_0.mp4"),
+        FakeBlob("generate_video_tool_agent/1/sample_0.proxy.mp4"),
+        FakeBlob("assets/a/1.png"),
+    ]
+    assert _scan(blobs, references) == []
+
+
+def test_dry_run_only_reports():
+    blobs = [FakeBlob("assets/a/1.png", size=5), FakeBlob("assets/a/2.png", size=7)]
+    report = io.StringIO()
+    summary = collect_garbage(blobs, "delete", True, report)
+    assert summary == {"objects": 2, "bytes": 12, "skipped": 0}
+    assert not any(blob.deleted for blob in blobs)
+    lines = [json.loads(line) for line in report.getvalue().splitlines()]
+    assert [line["uri"] for line in lines] == [
+        f"gs://{BUCKET}/assets/a/1.png",
+        f"gs://{BUCKET}/assets/a/2.png",
+    ]
+
+
+def test_delete_and_tiering():
+    blobs = [FakeBlob("assets/a/1.png")]
+    collect_garbage(blobs, "delete", False, io.StringIO())
+    assert blobs[0].deleted
+
+    blobs = [
+        FakeBlob("assets/a/1.png"),
+        FakeBlob("assets/a/2.png", storage_class="COLDLINE"),
+    ]
+    summary = collect_garbage(blobs, "coldline", False, io.StringIO())
+    assert [blob.storage_class for blob in blobs] == ["COLDLINE", "COLDLINE"]
+    assert summary["objects"] == 1 and summary["skipped"] == 1
+
+
+def test_references_of_all_users_in_session_database(tmp_path):
+    session_service = DatabaseSessionService(
+        db_url=f"sqlite:///{tmp_path / 'sessions.db'}"
+    )
+
+    async def _collect():
+        for user_id, uri in [
+            ("user-1", f"gs://{BUCKET}/assets/a/1.png"),
+            ("user-2", f"gs://{BUCKET}/generate_video_tool_agent/1/sample_0.mp4"),
+        ]:
+            await session_service.create_session(
+                app_name="video_generation",
+                user_id=user_id,
+                state={"media_artifacts": {uri: "artifact.png"}},
+            )
+        return await collect_references(session_service, ["video_generation"])
+
+    assert asyncio.run(_collect()) == {
+        f"gs://{BUCKET}/assets/a/1.png",
+        f"gs://{BUCKET}/generate_video_tool_agent/1/sample_0.mp4",
+    }
+
+
+def test_empty_session_source_aborts(tmp_path):
+    session_service = DatabaseSessionService(
+        db_url=f"sqlite:///{tmp_path / 'sessions.db'}"
+    )
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect_references(session_service, ["video_generation"]))
+    assert asyncio.run(
+        collect_references(session_service, ["video_generation"], allow_empty=True)
+    ) == set()
@@ -0,0 +1,123 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+import pytest
+
+
+class StubRunner:
+    """Runner whose agent generates one video per turn,
+    and fails on briefs that ask for it."""
+
+    def __init__(self, batch_render, session_service):
+        self.batch_render = batch_render
+        self.session_service = session_service
+        self.messages = []
+
+    async def run_async(self, user_id, session_id, new_message):
+        text = new_message.parts[0].text
+        self.messages.append(text)
+        if "FAIL" in text:
+            raise RuntimeError("Model is overloaded.")
+        session = await self.session_service.get_session(
+            app_name=self.batch_render.APP_NAME,
+            user_id=user_id,
+            session_id=session_id
+        )
+        media_artifacts = dict(
+            session.state.get(self.batch_render.MEDIA_ARTIFACTS_STATE_KEY, {})
+        )
+        video_uri = f"gs://bucket/{session_id}/{len(media_artifacts)}.mp4"
+        media_artifacts[video_uri] = "video.mp4"
+        media_artifacts[video_uri.replace(".mp4", ".proxy.mp4")] = "proxy.mp4"
+        event = Event(
+            author="root_agent",
+            invocation_id=f"{session_id}-{len(self.messages)}",
+            content=types.Content(
+                role="model",
+                parts=[types.Part.from_text(text="Generated a video.")]
+            ),
+            actions=EventActions(state_delta={
+                self.batch_render.MEDIA_ARTIFACTS_STATE_KEY: media_artifacts
+            }),
+        )
+        await self.session_service.append_event(session, event)
+        yield event
+
+
+@pytest.fixture
+def batch_render(offline_gcp):
+    import batch_render
+    return batch_render
+
+
+def _renderer(batch_render, output_dir, session_service, max_turns=5):
+    runner = StubRunner(batch_render, session_service)
+    renderer = batch_render.BatchRenderer(
+        output_dir=output_dir,
+        session_service=session_service,
+        artifact_service=InMemoryArtifactService(),
+        max_turns=max_turns,
+        runner=runner, # type: ignore
+    )
+    return renderer, runner
+
+
+def test_job_runs_until_all_shots_are_generated(batch_render, tmp_path):
+    renderer, runner = _renderer(
+        batch_render, tmp_path, InMemorySessionService()
+    )
+    result = asyncio.run(renderer.run_job({"id": "a", "brief": "Cats", "shots": 2}))
+    assert result["status"] == "done"
+    assert result["turns"] == 2
+    assert len(result["videos"]) == 2 # proxies are not deliverables
+    assert "Cats" in runner.messages[0]
+    assert runner.messages[1] == batch_render.CONTINUE_MESSAGE
+    saved = json.loads((tmp_path / "jobs" / "a.json").read_text())
+    assert saved == result
+
+
+def test_job_out_of_turns_continues_on_next_run(batch_render, tmp_path):
+    session_service = InMemorySessionService()
+    job = {"id": "a", "brief": "Cats", "shots": 3}
+    renderer, _ = _renderer(batch_render, tmp_path, session_service, 2)
+    result = asyncio.run(renderer.run_job(job))
+    assert result["status"] == "failed"
+    assert result["turns"] == 2
+
+    renderer, runner = _renderer(batch_render, tmp_path, session_service, 2)
+    result = asyncio.run(renderer.run_job(job))
+    assert result["status"] == "done"
+    assert result["turns"] == 3
+    assert runner.messages == [batch_render.CONTINUE_MESSAGE]
+
+
+def test_failed_job_does_not_stop_the_batch(batch_render, tmp_path):
+    renderer, _ = _renderer(batch_render, tmp_path, InMemorySessionService())
+    manifest_path = asyncio.run(renderer.run([
+        {"id": "a", "brief": "Cats", "shots": 1},
+        {"id": "b", "brief": "FAIL", "shots": 1},
+    ]))
+    results = [
+        json.loads(line)
+        for line in manifest_path.read_text().splitlines()
+    ]
+    assert [result["status"] for result in results] == ["done", "failed"]
+    assert results[1]["error"] == "Model is overloaded."
@@ -0,0 +1,34 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import google.auth
+from google.auth import impersonated_credentials
+from google.auth.credentials import AnonymousCredentials
+
+
+def test_impersonated_credentials_cannot_sign_locally(offline_gcp, monkeypatch):
+    from utils import delivery_utils
+
+    # Impersonated credentials sign through IAM signBlob API.
+    credentials = impersonated_credentials.Credentials(
+        source_credentials=AnonymousCredentials(),
+        target_principal="agent@test-project.iam.gserviceaccount.com",
+        target_scopes=["https://www.googleapis.com/auth/cloud-platform"],
+    )
+    monkeypatch.setattr(
+        google.auth,
+        "default",
+        lambda *args, **kwargs: (credentials, "test-project")
+    )
+    assert delivery_utils._get_signing_credentials() is None
@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from utils.hedging import HedgingPolicy
+
+MODEL = "test-model"
+
+
+class FakeModel:
+    """Fake model whose responses take the given times, in call order."""
+
+    def __init__(self, *latencies: float, failing: tuple[int, ...] = ()):
+        self.latencies = list(latencies)
+        self.failing = failing
+        self.calls = 0
+        self.cancelled = []
+
+    async def request(self) -> int:
+        call = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latencies[call])
+        except asyncio.CancelledError:
+            self.cancelled.append(call)
+            raise
+        if call in self.failing:
+            raise RuntimeError(f"429 on call {call}")
+        return call
+
+
+def _policy(**kwargs) -> HedgingPolicy:
+    kwargs.setdefault("default_delay_seconds", 0.05)
+    kwargs.setdefault("min_samples", 1000)
+    return HedgingPolicy(**kwargs)
+
+
+def test_fast_request_is_not_hedged():
+    policy = _policy()
+    model = FakeModel(0.0)
+    assert asyncio.run(policy.call(MODEL, model.request)) == 0
+    assert model.calls == 1
+    assert policy.hedges_count == 0
+
+
+def test_hedge_fires_after_delay_and_loser_is_cancelled():
+    policy = _policy()
+    model = FakeModel(5.0, 0.0)
+
+    async def _call():
+        result = await policy.call(MODEL, model.request)
+        await asyncio.sleep(0) # let the cancellation propagate
+        return result
+
+    assert asyncio.run(_call()) == 1
+    assert model.calls == 2
+    assert model.cancelled == [0]
+    assert policy.hedges_count == 1
+    # Both the hedge and the cancelled request are recorded,
+    # the cancelled one with at least the hedge delay.
+    samples = sorted(policy.histograms[MODEL].samples)
+    assert len(samples) == 2
+    assert samples[-1] >= 0.05
+
+
+def test_bad_result_waits_for_hedge():
+    policy = _policy()
+    model = FakeModel(0.1, 0.2)
+    result = asyncio.run(
+        policy.call(MODEL, model.request, lambda call: call == 1)
+    )
+    assert result == 1
+
+
+def test_budget_limits_hedges():
+    policy = _policy(budget=0.0)
+    model = FakeModel(0.2, 0.0, 0.2)
+
+    async def _calls():
+        first = await policy.call(MODEL, model.request)
+        second = await policy.call(MODEL, model.request)
+        return first, second
+
+    # Budget 0 allows one hedge only, the second slow call is not hedged.
+    assert asyncio.run(_calls()) == (1, 2)
+    assert model.calls == 3
+    assert policy.hedges_count == 1
+
+
+def test_delay_follows_observed_percentile():
+    policy = HedgingPolicy(min_samples=10, percentile=0.9)
+    assert policy.hedge_delay(MODEL) == policy.default_delay_seconds
+    for latency in range(1, 11):
+        policy._histogram(MODEL).record(float(latency))
+    assert policy.hedge_delay(MODEL) == 9.0
+
+
+def test_disabled_policy_makes_single_request():
+    policy = _policy(enabled=False)
+    model = FakeModel(0.1)
+    assert asyncio.run(policy.call(MODEL, model.request)) == 0
+    assert model.calls == 1
+    assert len(policy.histograms[MODEL].samples) == 1
+
+
+def test_errors_are_not_recorded():
+    policy = _policy()
+    model = FakeModel(0.0, failing=(0,))
+    with pytest.raises(RuntimeError):
+        asyncio.run(policy.call(MODEL, model.request))
+    assert not policy.histograms[MODEL].samples
+
+    policy = _policy(enabled=False)
+    with pytest.raises(RuntimeError):
+        asyncio.run(policy.call(MODEL, FakeModel(0.0, failing=(0,)).request))
+    assert not policy.histograms[MODEL].samples
+
+
+def test_result_is_preferred_over_error():
+    policy = _policy()
+    # The first request returns a result which isn't good,
+    # then the hedge fails.
+    model = FakeModel(0.1, 0.1, failing=(1,))
+    result = asyncio.run(
+        policy.call(MODEL, model.request, lambda call: False)
+    )
+    assert result == 0
+    assert model.calls == 2
+    assert len(policy.histograms[MODEL].samples) == 1
@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import re
+import subprocess
+import threading
+
+import imageio_ffmpeg
+import pytest
+
+AUTHORIZATION = "Bearer test-token"
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves one file with range requests, like the GCS endpoint."""
+    data = b""
+    ranges: list[str] = []
+
+    def do_GET(self):
+        if self.headers.get("Authorization") != AUTHORIZATION:
+            self.send_error(401)
+            return
+        start, end = 0, len(self.data) - 1
+        range_header = self.headers.get("Range")
+        if range_header:
+            self.ranges.append(range_header)
+            match = re.fullmatch(r"bytes=(\d+)-(\d*)", range_header)
+            assert match
+            start = int(match[1])
+            end = min(int(match[2] or end), end)
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{end}/{len(self.data)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Content-Type", "video/mp4")
+        self.end_headers()
+        try:
+            self.wfile.write(self.data[start:end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            pass # ffmpeg closes connections when it seeks
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def video_data(tmp_path_factory) -> bytes:
+    video_path = tmp_path_factory.mktemp("video") / "video.mp4"
+    subprocess.run(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(),
+            "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", "testsrc=duration=3:size=640x360:rate=24",
+            "-f", "lavfi", "-i", "sine=duration=3",
+            "-c:v", "libx264", "-g", "24", "-c:a", "aac",
+            "-y", str(video_path),
+        ],
+        check=True,
+    )
+    return video_path.read_bytes()
+
+
+@pytest.fixture
+def media_utils(offline_gcp, monkeypatch, video_data):
+    RangeRequestHandler.data = video_data
+    RangeRequestHandler.ranges = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    from utils import media_utils
+    monkeypatch.setattr(
+        media_utils,
+        "get_authorized_media_request",
+        lambda url: (
+            f"http://127.0.0.1:{server.server_port}/video.mp4",
+            {"Authorization": AUTHORIZATION}
+        )
+    )
+    yield media_utils
+    server.shutdown()
+    server.server_close()
+
+
+def test_extract_last_frame(media_utils):
+    data, mime_type = asyncio.run(
+        media_utils.extract_frame_from_gcs_video("gs://bucket/video.mp4")
+    )
+    assert mime_type == "image/png"
+    assert data.startswith(b"\x89PNG")
+    assert RangeRequestHandler.ranges # the video was read with range requests
+
+
+def test_extract_frame_at_timestamp(media_utils):
+    data, mime_type = asyncio.run(
+        media_utils.extract_frame_from_gcs_video(
+            "gs://bucket/video.mp4",
+            timestamp_seconds=1.5,
+            image_format="jpeg",
+        )
+    )
+    assert mime_type == "image/jpeg"
+    assert data.startswith(b"\xff\xd8")
+
+
+def test_render_preview(media_utils):
+    proxy_data, poster_data = asyncio.run(
+        media_utils.render_preview("gs://bucket/video.mp4")
+    )
+    assert proxy_data[4:8] == b"ftyp"
+    assert poster_data.startswith(b"\xff\xd8")
+    probe = subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-i", "pipe:"],
+        input=proxy_data,
+        capture_output=True,
+    )
+    streams = probe.stderr.decode()
+    assert re.search(r"Video: h264 .*x480", streams)
+    assert "Audio: aac" in streams
@@ -0,0 +1,76 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import hashlib
+
+from google.genai import types
+import pytest
+
+
+class FakeToolContext:
+
+    def __init__(self):
+        self.state = {}
+        self.artifacts = {}
+
+    async def save_artifact(self, filename, artifact):
+        self.artifacts.setdefault(filename, []).append(artifact)
+        return len(self.artifacts[filename]) - 1
+
+
+@pytest.fixture
+def subagents(offline_gcp):
+    import subagents
+    return subagents
+
+
+def test_web_image_is_saved_once_per_content(subagents):
+    tool_context = FakeToolContext()
+    url = "https://example.com/image.png"
+
+    async def _save(data):
+        return await subagents.save_media_artifact(
+            tool_context, url, data, "image/png"
+        )
+
+    first = asyncio.run(_save(b"image"))
+    assert asyncio.run(_save(b"image")) == first
+    assert tool_context.artifacts.keys() == {first}
+    assert len(tool_context.artifacts[first]) == 1
+    # Content at a web URL may change.
+    changed = asyncio.run(_save(b"new image"))
+    assert changed != first
+    assert len(tool_context.artifacts) == 2
+
+
+def test_object_without_md5_is_named_by_its_data(subagents, monkeypatch):
+    tool_context = FakeToolContext()
+    downloads = []
+
+    def _download(url):
+        downloads.append(url)
+        return types.Blob(data=b"composite", mime_type="video/mp4")
+
+    monkeypatch.setattr(
+        subagents,
+        "get_gcs_object_digest",
+        lambda url: (None, "video/mp4")
+    )
+    monkeypatch.setattr(subagents, "download_data_from_gcs", _download)
+    uri = "gs://bucket/composite.mp4"
+    name = asyncio.run(subagents.save_media_artifact(tool_context, uri))
+    assert name == f"{hashlib.md5(b'composite').hexdigest()}.mp4"
+    assert asyncio.run(subagents.save_media_artifact(tool_context, uri)) == name
+    assert downloads == [uri]
@@ -0,0 +1,28 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.tools import FunctionTool
+
+
+def test_generate_video_declaration_on_vertex_ai(offline_gcp, monkeypatch):
+    # Vertex AI declarations include the response schema,
+    # which is built from the return type.
+    monkeypatch.setenv("GOOGLE_GENAI_USE_VERTEXAI", "True")
+    from veo3_agent import generate_video
+
+    declaration = FunctionTool(generate_video)._get_declaration()
+    assert declaration
+    assert declaration.response
+    variants = declaration.response.properties["variants"] # type: ignore
+    assert variants.items.properties.keys() == {"uri", "error", "seed"} # type: ignore